@@ -4,36 +4,68 @@ ESP32 Board Simulation Script
 Simulates ESP32 boards communicating with the CoreAPI using binary protocol
 """
 
+import logging
 import requests
+from requests.adapters import HTTPAdapter
 import struct
+import sys
 import time
 import random
 import threading
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Configuration
 BASE_URL = "http://localhost"
 COREAPI_URL = f"{BASE_URL}/coreapi"
 
+# Poll interval (s); doubles while polls fail or no game is running, up to the max
+BASE_POLL_INTERVAL = 5
+MAX_POLL_INTERVAL = 30
+
+# Authorization lives on each board's session; binary endpoints only add this
+BINARY_HEADERS = {'Content-Type': 'application/octet-stream'}
+
+# Precompiled packer for the post_vals payload: production, consumption (mW)
+POST_VALS_STRUCT = struct.Struct('>ii')
+
+# Simulated boards: (display name, username, password)
+BOARD_CONFIGS = [
+    ("Solar Panel Board #1", "board1", "board123"),
+    ("Wind Turbine Board #2", "board2", "board456"),
+    ("Battery Storage Board #3", "board3", "board789"),
+]
+
 class ESP32BoardSimulator:
-    def __init__(self, board_name: str, username: str, password: str):
+    def __init__(self, board_name: str, username: str, password: str, adapter: Optional[HTTPAdapter] = None):
         self.board_name = board_name
         self.username = username
         self.password = password
         self.token = None
         self.headers = {}
         self.running = True
+        self.stop_event = threading.Event()
+        self.log = logging.getLogger(board_name)
+        
+        # Keep-alive session; boards may share one adapter (connection pool),
+        # while the token stays on each board's own session headers
+        self.owns_adapter = adapter is None
+        self.session = requests.Session()
+        self.session.mount(COREAPI_URL, adapter or HTTPAdapter(pool_connections=1, pool_maxsize=2))
         
         # Simulation state
         self.production = 0.0
         self.consumption = 0.0
         self.connected_power_plants = []
         self.connected_consumers = []
+        self.last_poll_data = None
+        
+        # Per-board RNG (seeded from os.urandom) so boards don't share global state
+        self.rng = random.Random()
     
     def login(self) -> bool:
         """Authenticate with the API and get JWT token"""
         try:
-            response = requests.post(f"{COREAPI_URL}/login", 
+            response = self.session.post(f"{COREAPI_URL}/login", 
                                    json={
                                        'username': self.username,
                                        'password': self.password
@@ -43,14 +75,15 @@ class ESP32BoardSimulator:
                 data = response.json()
                 self.token = data['token']
                 self.headers = {'Authorization': f'Bearer {self.token}'}
-                print(f"[{self.board_name}] ✅ Logged in successfully")
+                self.session.headers.update(self.headers)
+                self.log.info("✅ Logged in successfully")
                 return True
             else:
-                print(f"[{self.board_name}] ❌ Login failed: {response.status_code}")
+                self.log.error("❌ Login failed: %d", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"[{self.board_name}] ❌ Login error: {e}")
+            self.log.error("❌ Login error: %s", e)
             return False
     
     def register_board(self) -> bool:
@@ -59,38 +92,45 @@ class ESP32BoardSimulator:
             # Binary registration now requires only JWT authentication
             # No board data needed in request - board ID comes from JWT token
             
-            response = requests.post(f"{COREAPI_URL}/register",
+            response = self.session.post(f"{COREAPI_URL}/register",
                                    data=b'',  # Empty data - board ID extracted from JWT
-                                   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
+                                   headers=BINARY_HEADERS)
             
             if response.status_code == 200:
-                print(f"[{self.board_name}] ✅ Board registered successfully")
+                self.log.info("✅ Board registered successfully")
                 return True
             else:
-                print(f"[{self.board_name}] ❌ Registration failed: {response.status_code}")
+                self.log.error("❌ Registration failed: %d", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"[{self.board_name}] ❌ Registration error: {e}")
+            self.log.error("❌ Registration error: %s", e)
             return False
     
     def poll_binary(self) -> bool:
         """Poll the board status using binary protocol"""
         try:
-            response = requests.get(f"{COREAPI_URL}/poll_binary",
-                                  headers=self.headers)
+            response = self.session.get(f"{COREAPI_URL}/poll_binary")
             
             if response.status_code == 200:
-                print(f"[{self.board_name}] 📡 Received game coefficients")
+                # Report new game state once; unchanged polls only at DEBUG
+                level = logging.INFO if response.content != self.last_poll_data else logging.DEBUG
+                self.last_poll_data = response.content
+                self.log.log(level, "📡 Received game coefficients")
                 return True
             else:
-                print(f"[{self.board_name}] ⚠️ Poll failed: {response.status_code}")
+                self.log.warning("⚠️ Poll failed: %d", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"[{self.board_name}] ❌ Poll error: {e}")
+            self.log.error("❌ Poll error: %s", e)
             return False
     
+    def game_active(self) -> bool:
+        """A game is running when the last poll carried production coefficients"""
+        # Poll frame: prod_count(1) + [source_id(1) + coeff(4)]* + cons_count(1) + ...
+        return bool(self.last_poll_data) and self.last_poll_data[0] > 0
+    
     def send_power_data(self, production: float, consumption: float) -> bool:
         """Send power data using binary protocol (post_vals endpoint)"""
         try:
@@ -98,125 +138,154 @@ class ESP32BoardSimulator:
             prod_int = int(production * 1000)
             cons_int = int(consumption * 1000)
             
-            data = struct.pack('>ii', prod_int, cons_int)
+            data = POST_VALS_STRUCT.pack(prod_int, cons_int)
             
-            response = requests.post(f"{COREAPI_URL}/post_vals",
+            response = self.session.post(f"{COREAPI_URL}/post_vals",
                                    data=data,
-                                   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
+                                   headers=BINARY_HEADERS)
             
             if response.status_code == 200:
                 self.production = production
                 self.consumption = consumption
                 return True
             else:
-                print(f"[{self.board_name}] ⚠️ Power data failed: {response.status_code}")
+                self.log.warning("⚠️ Power data failed: %d", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"[{self.board_name}] ❌ Power data error: {e}")
+            self.log.error("❌ Power data error: %s", e)
             return False
     
     def report_connected_production(self, plant_ids: list) -> bool:
         """Report connected power plants"""
         try:
             count = len(plant_ids)
-            data = struct.pack('B', count)
-            
+            fields = []
             for plant_id in plant_ids:
-                set_power = random.randint(500, 2000)  # Random set power in mW
-                data += struct.pack('>Ii', plant_id, set_power)
+                set_power = self.rng.randint(500, 2000)  # Random set power in mW
+                fields += (plant_id, set_power)
             
-            response = requests.post(f"{COREAPI_URL}/prod_connected",
+            # count(1) + [plant_id(4) + set_power(4)]* packed in one call
+            data = struct.pack(f'>B{"Ii" * count}', count, *fields)
+            
+            response = self.session.post(f"{COREAPI_URL}/prod_connected",
                                    data=data,
-                                   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
+                                   headers=BINARY_HEADERS)
             
             if response.status_code == 200:
                 self.connected_power_plants = plant_ids
-                print(f"[{self.board_name}] ✅ Reported {count} connected power plants")
+                self.log.info("✅ Reported %d connected power plants", count)
                 return True
             else:
-                print(f"[{self.board_name}] ⚠️ Production report failed: {response.status_code}")
+                self.log.warning("⚠️ Production report failed: %d", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"[{self.board_name}] ❌ Production report error: {e}")
+            self.log.error("❌ Production report error: %s", e)
             return False
     
     def report_connected_consumption(self, consumer_ids: list) -> bool:
         """Report connected consumers"""
         try:
             count = len(consumer_ids)
-            data = struct.pack('B', count)
-            
-            for consumer_id in consumer_ids:
-                data += struct.pack('>I', consumer_id)
+            # count(1) + [consumer_id(4)]* packed in one call
+            data = struct.pack(f'>B{count}I', count, *consumer_ids)
             
-            response = requests.post(f"{COREAPI_URL}/cons_connected",
+            response = self.session.post(f"{COREAPI_URL}/cons_connected",
                                    data=data,
-                                   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
+                                   headers=BINARY_HEADERS)
             
             if response.status_code == 200:
                 self.connected_consumers = consumer_ids
-                print(f"[{self.board_name}] ✅ Reported {count} connected consumers")
+                self.log.info("✅ Reported %d connected consumers", count)
                 return True
             else:
-                print(f"[{self.board_name}] ⚠️ Consumption report failed: {response.status_code}")
+                self.log.warning("⚠️ Consumption report failed: %d", response.status_code)
                 return False
                 
         except Exception as e:
-            print(f"[{self.board_name}] ❌ Consumption report error: {e}")
+            self.log.error("❌ Consumption report error: %s", e)
             return False
     
     def generate_realistic_data(self) -> tuple[float, float]:
         """Generate realistic power data based on board type"""
         # Simple simulation - random values for demonstration
-        production = random.uniform(800, 1500)  # 800-1500W
-        consumption = random.uniform(200, 600)  # 200-600W
+        production = self.rng.uniform(800, 1500)  # 800-1500W
+        consumption = self.rng.uniform(200, 600)  # 200-600W
         
         return production, consumption
     
     def simulate_board_operation(self):
         """Main simulation loop"""
-        print(f"[{self.board_name}] 🎮 Starting board simulation")
-        
-        # Login and register
-        if not self.login():
-            return
-        
-        if not self.register_board():
-            return
+        try:
+            self.log.info("🎮 Starting board simulation")
             
-        # Report some initial connections
-        self.report_connected_production([1, 2, 3])  # Connected to power plants 1, 2, 3
-        self.report_connected_consumption([1, 2])     # Connected to consumers 1, 2
-        
-        # Main simulation loop
-        while self.running:
-            try:
-                # Poll for game status
-                if self.poll_binary():
-                    # Generate and send power data
-                    prod, cons = self.generate_realistic_data()
-                    if self.send_power_data(prod, cons):
-                        print(f"[{self.board_name}] 📊 Sent: Production={prod:.1f}W, Consumption={cons:.1f}W")
-                
-                # Wait before next update
-                time.sleep(5)
+            # Login and register
+            if not self.login():
+                return
+            
+            if not self.register_board():
+                return
                 
-            except KeyboardInterrupt:
-                print(f"[{self.board_name}] 🛑 Stopping simulation")
-                self.running = False
-                break
-            except Exception as e:
-                print(f"[{self.board_name}] ❌ Simulation error: {e}")
-                time.sleep(2)
+            # Report some initial connections
+            self.report_connected_production([1, 2, 3])  # Connected to power plants 1, 2, 3
+            self.report_connected_consumption([1, 2])     # Connected to consumers 1, 2
+            
+            # Main simulation loop
+            interval = BASE_POLL_INTERVAL
+            # Random per-board phase so boards started together don't post in lockstep
+            next_tick = time.monotonic() + self.rng.uniform(0, BASE_POLL_INTERVAL)
+            while self.running:
+                try:
+                    # Poll for game status
+                    polled = self.poll_binary()
+                    if polled:
+                        # Generate and send power data
+                        prod, cons = self.generate_realistic_data()
+                        if self.send_power_data(prod, cons):
+                            self.log.debug("📊 Sent: Production=%.1fW, Consumption=%.1fW", prod, cons)
+                    
+                    # Keep the base cadence during a game (post_vals is read as live
+                    # state); back off while the server fails or reports no game
+                    if polled and self.game_active():
+                        interval = BASE_POLL_INTERVAL
+                    else:
+                        interval = min(interval * 2, MAX_POLL_INTERVAL)
+                    
+                    # Jitter retries after a failed poll so boards don't reconnect
+                    # in lockstep once the server comes back
+                    delay = interval if polled else interval * self.rng.uniform(0.5, 1.5)
+                    
+                    # Wait until the next deadline so request time doesn't stretch
+                    # the period (returns early when stopped)
+                    now = time.monotonic()
+                    next_tick = max(next_tick + delay, now)
+                    self.stop_event.wait(next_tick - now)
+                    
+                except KeyboardInterrupt:
+                    self.log.info("🛑 Stopping simulation")
+                    self.running = False
+                    break
+                except Exception as e:
+                    self.log.error("❌ Simulation error: %s", e)
+                    interval = min(interval * 2, MAX_POLL_INTERVAL)
+                    self.stop_event.wait(interval * self.rng.uniform(0.5, 1.5))
+        finally:
+            # Release the pooled socket once the board thread is done; a shared
+            # adapter is closed by its owner after all boards have stopped
+            if self.owns_adapter:
+                self.session.close()
     
     def stop(self):
         """Stop the simulation"""
         self.running = False
+        self.stop_event.set()
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(name)s] %(message)s',
+                        stream=sys.stdout)
+    
     print("🤖 ESP32 Board Simulator")
     print("=" * 50)
     
@@ -232,32 +301,38 @@ def main():
         print("Make sure Docker services are running: docker-compose up")
         return
     
+    # One connection pool for all boards (every board talks to the same host)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2 * len(BOARD_CONFIGS))
+    
     # Create board simulators
     boards = [
-        ESP32BoardSimulator("Solar Panel Board #1", "board1", "board123"),
-        ESP32BoardSimulator("Wind Turbine Board #2", "board2", "board456"), 
-        ESP32BoardSimulator("Battery Storage Board #3", "board3", "board789")
+        ESP32BoardSimulator(name, username, password, adapter=adapter)
+        for name, username, password in BOARD_CONFIGS
     ]
     
-    # Start simulation threads
+    # Start simulation threads together so the login/register round trips overlap
     threads = []
     for board in boards:
         thread = threading.Thread(target=board.simulate_board_operation)
         thread.daemon = True
         threads.append(thread)
         thread.start()
-        time.sleep(1)  # Stagger the starts
     
     try:
         print("\n🔄 Boards are running. Press Ctrl+C to stop all simulations.")
-        while True:
-            time.sleep(1)
+        # Block until every board thread exits (e.g. all logins failed)
+        for thread in threads:
+            thread.join()
     except KeyboardInterrupt:
         print("\n🛑 Stopping all board simulations...")
         for board in boards:
             board.stop()
+        for thread in threads:
+            thread.join(timeout=5)
         
         print("✅ All simulations stopped.")
+    finally:
+        adapter.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Shared helper for the test scripts that run the ESP32 board simulation
+Starts scripts/esp32_board_simulation.py and stops it once the boards report in
+"""
+
+import os
+import subprocess
+import sys
+import threading
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+
+# Log lines that show the simulated boards reached the API; the simulation is
+# stopped as soon as both appear, or after ESP32_TIMEOUT seconds (env override)
+ESP32_MARKERS = ("Board registered successfully", "Received game coefficients")
+ESP32_TIMEOUT = float(os.environ.get("ESP32_TIMEOUT", "30"))
+
+def run_esp32_simulation(timeout: float = ESP32_TIMEOUT) -> set:
+    """Run the ESP32 simulation, echoing its output; return the markers seen"""
+    process = subprocess.Popen(
+        [sys.executable, "-u", "esp32_board_simulation.py"],
+        cwd=SCRIPTS_DIR, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1)
+
+    # Stop the simulation at the deadline even if it goes quiet
+    timer = threading.Timer(timeout, process.terminate)
+    timer.start()
+    seen = set()
+    try:
+        for line in process.stdout:
+            print(line, end='')
+            seen.update(marker for marker in ESP32_MARKERS if marker in line)
+            if len(seen) == len(ESP32_MARKERS):
+                break
+    finally:
+        timer.cancel()
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    return seen
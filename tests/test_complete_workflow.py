@@ -5,13 +5,22 @@ Tests the complete lecturer workflow with new frontend
 """
 
 import requests
+import logging
+import sys
 import threading
 import time
-import subprocess
-import sys
+
+from esp32_runner import ESP32_MARKERS, SCRIPTS_DIR
 
 BASE_URL = "http://localhost"
 COREAPI_URL = f"{BASE_URL}/coreapi"
+LECTURER_CREDENTIALS = {'username': 'lecturer1', 'password': 'lecturer123'}
+
+# The ESP32 test stops as soon as both markers have been seen; this is only a safety net
+ESP32_TIMEOUT = 20
+
+# One keep-alive session for every call in the script
+SESSION = requests.Session()
 
 def test_backend_workflow():
     """Test the backend workflow step by step"""
@@ -20,22 +29,19 @@ def test_backend_workflow():
     
     # Login as lecturer
     print("1. 🔐 Testing lecturer login...")
-    login_response = requests.post(f"{COREAPI_URL}/login", json={
-        'username': 'lecturer1',
-        'password': 'lecturer123'
-    })
+    login_response = SESSION.post(f"{COREAPI_URL}/login", json=LECTURER_CREDENTIALS)
     
     if login_response.status_code != 200:
         print(f"❌ Login failed: {login_response.status_code}")
         return False
     
     token = login_response.json()['token']
-    headers = {'Authorization': f'Bearer {token}'}
+    SESSION.headers.update({'Authorization': f'Bearer {token}'})
     print("✅ Lecturer login successful")
     
     # Get scenarios
     print("2. 📋 Getting available scenarios...")
-    scenarios_response = requests.get(f"{COREAPI_URL}/scenarios", headers=headers)
+    scenarios_response = SESSION.get(f"{COREAPI_URL}/scenarios")
     if scenarios_response.status_code == 200:
         scenarios = scenarios_response.json()['scenarios']
         print(f"✅ Found scenarios: {scenarios}")
@@ -45,9 +51,8 @@ def test_backend_workflow():
     
     # Start game (without automatically advancing)
     print("3. 🎮 Starting game...")
-    start_response = requests.post(f"{COREAPI_URL}/start_game", 
-                                 json={'scenario_id': 'demo'}, 
-                                 headers=headers)
+    start_response = SESSION.post(f"{COREAPI_URL}/start_game", 
+                                 json={'scenario_id': 'demo'})
     if start_response.status_code == 200:
         print("✅ Game started successfully")
         print(f"   Response: {start_response.json()}")
@@ -57,7 +62,7 @@ def test_backend_workflow():
     
     # Get PDF
     print("4. 📄 Getting PDF...")
-    pdf_response = requests.get(f"{COREAPI_URL}/get_pdf", headers=headers)
+    pdf_response = SESSION.get(f"{COREAPI_URL}/get_pdf")
     if pdf_response.status_code == 200:
         pdf_url = pdf_response.json()['url']
         print(f"✅ PDF URL: {pdf_url}")
@@ -67,15 +72,17 @@ def test_backend_workflow():
     
     # Test PDF download
     print("5. 📥 Testing PDF download...")
-    pdf_download_response = requests.get(f"{COREAPI_URL}/download_pdf/presentation.pdf", headers=headers)
-    if pdf_download_response.status_code == 200:
-        print(f"✅ PDF download successful ({len(pdf_download_response.content)} bytes)")
-    else:
-        print(f"❌ PDF download failed: {pdf_download_response.status_code}")
+    # Stream the body and only count it, so the PDF is never held in memory
+    with SESSION.get(f"{COREAPI_URL}/download_pdf/presentation.pdf", stream=True) as pdf_download_response:
+        if pdf_download_response.status_code == 200:
+            pdf_size = sum(len(chunk) for chunk in pdf_download_response.iter_content(65536))
+            print(f"✅ PDF download successful ({pdf_size} bytes)")
+        else:
+            print(f"❌ PDF download failed: {pdf_download_response.status_code}")
     
     # Advance to first round
     print("6. ⏭️ Advancing to first round...")
-    next_response = requests.post(f"{COREAPI_URL}/next_round", json={}, headers=headers)
+    next_response = SESSION.post(f"{COREAPI_URL}/next_round", json={})
     if next_response.status_code == 200:
         round_data = next_response.json()
         print(f"✅ Advanced to round {round_data.get('round')}")
@@ -90,7 +97,7 @@ def test_backend_workflow():
     
     # Test pollforusers
     print("7. 📊 Testing board polling...")
-    poll_response = requests.get(f"{COREAPI_URL}/pollforusers", headers=headers)
+    poll_response = SESSION.get(f"{COREAPI_URL}/pollforusers")
     if poll_response.status_code == 200:
         poll_data = poll_response.json()
         print(f"✅ Board polling successful")
@@ -103,39 +110,81 @@ def test_backend_workflow():
     print("\n✅ Backend workflow test completed successfully!")
     return True
 
+def wait_for_game_active(timeout: float = 3.0) -> bool:
+    """Poll /pollforusers until the game reports active, up to timeout seconds"""
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while time.monotonic() < deadline:
+        try:
+            response = SESSION.get(f"{COREAPI_URL}/pollforusers", timeout=0.5)
+            if response.status_code == 200 and response.json().get('game_status', {}).get('game_active'):
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+    return False
+
 def test_esp32_boards():
-    """Test ESP32 board simulation"""
+    """Test ESP32 board simulation (in-process, until the boards report in)"""
     print("\n🤖 Testing ESP32 Boards")
     print("-" * 40)
     
+    seen = set()
+    all_seen = threading.Event()
+    
+    class MarkerHandler(logging.Handler):
+        """Echo board log lines and record which markers appeared"""
+        def emit(self, record):
+            message = f"[{record.name}] {record.getMessage()}"
+            print(message)
+            seen.update(marker for marker in ESP32_MARKERS if marker in message)
+            if len(seen) == len(ESP32_MARKERS):
+                all_seen.set()
+    
+    handler = MarkerHandler()
+    boards = []
+    threads = []
     try:
-        # Run ESP32 simulation for 20 seconds
-        result = subprocess.run([
-            "timeout", "20", "python", "esp32_board_simulation.py"
-        ], cwd="/home/jirka/programovani/ea/WebControl", 
-           capture_output=True, text=True)
+        if SCRIPTS_DIR not in sys.path:
+            sys.path.insert(0, SCRIPTS_DIR)
+        from esp32_board_simulation import ESP32BoardSimulator, BOARD_CONFIGS
+        
+        boards = [ESP32BoardSimulator(*config) for config in BOARD_CONFIGS]
         
         print("ESP32 Simulation Output:")
-        print(result.stdout)
-        if result.stderr:
-            print("ESP32 Errors:")
-            print(result.stderr)
+        for board in boards:
+            board.log.setLevel(logging.INFO)
+            board.log.addHandler(handler)
+            thread = threading.Thread(target=board.simulate_board_operation, daemon=True)
+            threads.append(thread)
+            thread.start()
+        
+        all_seen.wait(ESP32_TIMEOUT)
         
         # Check if boards registered successfully
-        if "Board registered successfully" in result.stdout:
+        if "Board registered successfully" in seen:
             print("✅ ESP32 boards registered successfully")
         else:
             print("❌ ESP32 board registration failed")
             
-        if "Received game coefficients" in result.stdout:
+        if "Received game coefficients" in seen:
             print("✅ ESP32 boards received game data")
         else:
             print("❌ ESP32 boards failed to receive game data")
         
-        return result.returncode in [0, 124]  # 124 is timeout exit code
+        return len(seen) == len(ESP32_MARKERS)
     except Exception as e:
         print(f"❌ ESP32 test error: {e}")
         return False
+    finally:
+        for board in boards:
+            board.stop()
+        for thread in threads:
+            thread.join(timeout=5)
+        # Board loggers are process-wide; don't leave the echo handler behind
+        for board in boards:
+            board.log.removeHandler(handler)
 
 def main():
     print("🧪 Complete Workflow Test - Frontend + Backend + ESP32")
@@ -144,7 +193,7 @@ def main():
     # Test API connectivity
     print("🔍 Checking API connectivity...")
     try:
-        response = requests.get(f"{COREAPI_URL}/health", timeout=5)
+        response = SESSION.get(f"{COREAPI_URL}/health", timeout=5)
         if response.status_code == 200:
             print("✅ CoreAPI is accessible")
         else:
@@ -160,9 +209,10 @@ def main():
         print("❌ Backend workflow test failed")
         return
     
-    # Wait a moment
-    print("\n⏳ Waiting 3 seconds before testing ESP32...")
-    time.sleep(3)
+    # Make sure the game is running before the boards start polling
+    print("\n⏳ Waiting for the game to be active before testing ESP32...")
+    if not wait_for_game_active():
+        print("⚠️ Game not reported active yet, testing ESP32 anyway")
     
     # Test ESP32 boards
     if test_esp32_boards():
@@ -4,35 +4,34 @@ Integration test - Start a game and test ESP32 boards simultaneously
 """
 
 import requests
-import threading
 import time
-import subprocess
-import sys
+
+from esp32_runner import ESP32_MARKERS, run_esp32_simulation
 
 BASE_URL = "http://localhost"
 COREAPI_URL = f"{BASE_URL}/coreapi"
+LECTURER_CREDENTIALS = {'username': 'lecturer1', 'password': 'lecturer123'}
+
+# One keep-alive session for every call in the script
+SESSION = requests.Session()
 
 def start_game():
     """Start a game using lecturer credentials"""
     print("🎮 Starting game...")
     
     # Login as lecturer
-    login_response = requests.post(f"{COREAPI_URL}/login", json={
-        'username': 'lecturer1',
-        'password': 'lecturer123'
-    })
+    login_response = SESSION.post(f"{COREAPI_URL}/login", json=LECTURER_CREDENTIALS)
     
     if login_response.status_code != 200:
         print("❌ Lecturer login failed")
         return False
     
     token = login_response.json()['token']
-    headers = {'Authorization': f'Bearer {token}'}
+    SESSION.headers.update({'Authorization': f'Bearer {token}'})
     
     # Start game with demo scenario
-    start_response = requests.post(f"{COREAPI_URL}/start_game", 
-                                 json={'scenario_id': 'demo'}, 
-                                 headers=headers)
+    start_response = SESSION.post(f"{COREAPI_URL}/start_game", 
+                                 json={'scenario_id': 'demo'})
     
     if start_response.status_code == 200:
         print("✅ Game started successfully")
@@ -42,23 +41,14 @@ def start_game():
         return False
 
 def test_esp32_boards():
-    """Test ESP32 board simulation for 30 seconds"""
+    """Test ESP32 board simulation until the boards report in"""
     print("🤖 Testing ESP32 boards...")
     
     try:
-        # Run ESP32 simulation for 30 seconds
-        result = subprocess.run([
-            "timeout", "30", "python", "esp32_board_simulation.py"
-        ], cwd="/home/jirka/programovani/ea/WebControl", 
-           capture_output=True, text=True)
-        
         print("ESP32 Output:")
-        print(result.stdout)
-        if result.stderr:
-            print("ESP32 Errors:")
-            print(result.stderr)
+        seen = run_esp32_simulation()
         
-        return result.returncode in [0, 124]  # 124 is timeout exit code
+        return len(seen) == len(ESP32_MARKERS)
     except Exception as e:
         print(f"❌ ESP32 test error: {e}")
         return False
@@ -69,7 +59,7 @@ def main():
     
     # Test API connectivity
     try:
-        response = requests.get(f"{COREAPI_URL}/health", timeout=5)
+        response = SESSION.get(f"{COREAPI_URL}/health", timeout=5)
         if response.status_code == 200:
             print("✅ CoreAPI is accessible")
         else:
@@ -5,6 +5,7 @@ Tests the new scenario-based game management system
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 from typing import Dict, Optional
@@ -20,11 +21,15 @@ class LecturerInterface:
         self.password = password
         self.token = None
         self.headers = {}
+        
+        # Keep-alive session so the whole test run reuses one connection
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
     
     def login(self) -> bool:
         """Login to get authentication token"""
         try:
-            response = requests.post(f"{COREAPI_URL}/login", 
+            response = self.session.post(f"{COREAPI_URL}/login", 
                                    json={
                                        'username': self.username,
                                        'password': self.password
@@ -34,6 +39,7 @@ class LecturerInterface:
                 data = response.json()
                 self.token = data['token']
                 self.headers = {'Authorization': f'Bearer {self.token}'}
+                self.session.headers.update(self.headers)
                 print(f"✅ Logged in as {data['username']} ({data['user_type']})")
                 return True
             else:
@@ -47,7 +53,7 @@ class LecturerInterface:
     def get_scenarios(self):
         """Get available scenarios"""
         try:
-            response = requests.get(f"{COREAPI_URL}/scenarios", headers=self.headers)
+            response = self.session.get(f"{COREAPI_URL}/scenarios")
             
             if response.status_code == 200:
                 data = response.json()
@@ -65,9 +71,8 @@ class LecturerInterface:
     def start_game(self, scenario_id: str):
         """Start game with specific scenario"""
         try:
-            response = requests.post(f"{COREAPI_URL}/start_game", 
-                                   json={'scenario_id': scenario_id},
-                                   headers=self.headers)
+            response = self.session.post(f"{COREAPI_URL}/start_game", 
+                                   json={'scenario_id': scenario_id})
             
             if response.status_code == 200:
                 data = response.json()
@@ -90,7 +95,7 @@ class LecturerInterface:
     def get_pdf(self):
         """Get PDF URL for current scenario"""
         try:
-            response = requests.get(f"{COREAPI_URL}/get_pdf", headers=self.headers)
+            response = self.session.get(f"{COREAPI_URL}/get_pdf")
             
             if response.status_code == 200:
                 data = response.json()
@@ -108,7 +113,7 @@ class LecturerInterface:
     def next_round(self):
         """Advance to next round"""
         try:
-            response = requests.post(f"{COREAPI_URL}/next_round", headers=self.headers)
+            response = self.session.post(f"{COREAPI_URL}/next_round")
             
             if response.status_code == 200:
                 data = response.json()
@@ -131,7 +136,7 @@ class LecturerInterface:
     def get_statistics(self):
         """Get game statistics"""
         try:
-            response = requests.get(f"{COREAPI_URL}/get_statistics", headers=self.headers)
+            response = self.session.get(f"{COREAPI_URL}/get_statistics")
             
             if response.status_code == 200:
                 data = response.json()
@@ -162,7 +167,7 @@ class LecturerInterface:
     def end_game(self):
         """End the current game"""
         try:
-            response = requests.post(f"{COREAPI_URL}/end_game", headers=self.headers)
+            response = self.session.post(f"{COREAPI_URL}/end_game")
             
             if response.status_code == 200:
                 data = response.json()
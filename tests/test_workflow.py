@@ -7,28 +7,28 @@ import requests
 
 BASE_URL = "http://localhost"
 COREAPI_URL = f"{BASE_URL}/coreapi"
+LECTURER_CREDENTIALS = {'username': 'lecturer1', 'password': 'lecturer123'}
+
+# One keep-alive session for every call in the script
+SESSION = requests.Session()
 
 def test_next_round_workflow():
     print("🧪 Testing New Next Round Workflow")
     print("=" * 50)
     
     # Login as lecturer
-    login_response = requests.post(f"{COREAPI_URL}/login", json={
-        'username': 'lecturer1',
-        'password': 'lecturer123'
-    })
+    login_response = SESSION.post(f"{COREAPI_URL}/login", json=LECTURER_CREDENTIALS)
     
     if login_response.status_code != 200:
         print("❌ Login failed")
         return
     
     token = login_response.json()['token']
-    headers = {'Authorization': f'Bearer {token}'}
+    SESSION.headers.update({'Authorization': f'Bearer {token}'})
     
     # Start game
-    start_response = requests.post(f"{COREAPI_URL}/start_game", 
-                                 json={'scenario_id': 'demo'}, 
-                                 headers=headers)
+    start_response = SESSION.post(f"{COREAPI_URL}/start_game", 
+                                 json={'scenario_id': 'demo'})
     
     if start_response.status_code != 200:
         print("❌ Failed to start game")
@@ -39,7 +39,7 @@ def test_next_round_workflow():
     # Test first round advancement
     print("\n📋 Testing next round responses...")
     for i in range(3):
-        next_response = requests.post(f"{COREAPI_URL}/next_round", json={}, headers=headers)
+        next_response = SESSION.post(f"{COREAPI_URL}/next_round", json={})
         
         if next_response.status_code == 200:
             data = next_response.json()
@@ -64,7 +64,7 @@ def test_next_round_workflow():
             break
     
     # Test PDF download
-    pdf_response = requests.get(f"{COREAPI_URL}/get_pdf", headers=headers)
+    pdf_response = SESSION.get(f"{COREAPI_URL}/get_pdf")
     if pdf_response.status_code == 200:
         pdf_data = pdf_response.json()
         print(f"\n📄 PDF URL: {pdf_data.get('url')}")
@@ -72,14 +72,16 @@ def test_next_round_workflow():
         # Try to download the PDF
         if pdf_data.get('url', '').startswith('/coreapi/'):
             download_url = f"{BASE_URL}{pdf_data['url']}"
-            download_response = requests.get(download_url, headers=headers)
-            if download_response.status_code == 200:
-                print(f"✅ PDF downloaded successfully ({len(download_response.content)} bytes)")
-            else:
-                print(f"❌ PDF download failed: {download_response.status_code}")
+            # Stream the body and only count it, so the PDF is never held in memory
+            with SESSION.get(download_url, stream=True) as download_response:
+                if download_response.status_code == 200:
+                    pdf_size = sum(len(chunk) for chunk in download_response.iter_content(65536))
+                    print(f"✅ PDF downloaded successfully ({pdf_size} bytes)")
+                else:
+                    print(f"❌ PDF download failed: {download_response.status_code}")
     
     # End game
-    end_response = requests.post(f"{COREAPI_URL}/end_game", json={}, headers=headers)
+    end_response = SESSION.post(f"{COREAPI_URL}/end_game", json={})
     if end_response.status_code == 200:
         print("\n✅ Game ended successfully")
     
@@ -4,32 +4,77 @@ Handles individual ESP32 board simulation and API communication
 """
 
 import requests
+import random
 import struct
-import sys
-import os
-from typing import Dict, Any, Callable
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Callable, Optional
 
 from config import COREAPI_URL, POWER_PLANT_POWERS, CONSUMER_POWERS
 from Enak import Building
 
-# Import GLOBAL_PRODUCTION_COEFFICIENTS with path workaround
-sys.path.insert(0, os.path.dirname(__file__))
-try:
-	from game_state import GLOBAL_PRODUCTION_COEFFICIENTS
-except ImportError:
-	# Fallback if module structure changes
-	GLOBAL_PRODUCTION_COEFFICIENTS = {}
+# Use the same game_state module as the caller: core.game_state under main.py,
+# the top-level game_state when tui_simulator.py has put core/ on sys.path
+if __package__:
+	from . import game_state
+else:
+	import game_state
+SOURCE_NAMES = game_state.SOURCE_NAMES
+
+# Binary protocol source ids -> plant types (lower-case keys of self.sources)
+PLANT_TYPES = {source_id: name.lower() for source_id, name in SOURCE_NAMES.items()}
+
+# Authorization lives on each board's session; binary endpoints only add this
+BINARY_HEADERS = {'Content-Type': 'application/octet-stream'}
+
+# Precompiled packer for the post_vals payload: production, consumption (mW)
+POST_VALS_STRUCT = struct.Struct('>ii')
+# Precompiled unpackers for /prod_vals (source_id, min, max) and /cons_vals (id, value);
+# entries are read in place with unpack_from rather than sliced out
+PROD_RANGE_STRUCT = struct.Struct('>Bii')
+CONS_VAL_STRUCT = struct.Struct('>Bi')
+
+def create_http_adapter(pool_maxsize: int = 4) -> HTTPAdapter:
+	"""Create a pooled adapter for CoreAPI sessions.
+	Connection errors are retried with exponential backoff for any request.
+	Gateway errors while CoreAPI restarts behind nginx are retried for GETs
+	only, and read errors not at all (read=0): in both cases the server may
+	already have handled a POST such as /login, /register or /post_vals.
+	"""
+	return HTTPAdapter(
+		pool_connections=2,
+		pool_maxsize=pool_maxsize,
+		max_retries=Retry(
+			total=3,
+			read=0,
+			backoff_factor=0.25,
+			status_forcelist=[502, 503, 504],
+			allowed_methods=frozenset(["GET"]),
+			raise_on_status=False
+		)
+	)
 
 class ESP32BoardSimulator:
-	def __init__(self, board_name: str, username: str, password: str, log_callback: Callable[[str], None]):
+	def __init__(self, board_name: str, username: str, password: str, log_callback: Callable[[str], None], adapter: Optional[HTTPAdapter] = None):
 		self.board_name = board_name
 		self.username = username
 		self.password = password
 		self.token = None
 		self.headers = {}
 		self.running = False
+		# Set by stop(); each run gets a fresh event (see simulate_board_operation)
+		self.stop_event = threading.Event()
 		self.log = log_callback
-		
+
+		# Keep-alive session; boards may share one adapter (connection pool)
+		# while each session keeps its own bearer token
+		self.session = requests.Session()
+		self.session.mount("http://", adapter or create_http_adapter())
+
+		# Per-board RNG for tick phase and retry jitter, independent of the global one
+		self.rng = random.Random()
+
 		# Simulation state
 		self.status = "Stopped"
 		self.production = 0.0
@@ -49,7 +94,7 @@ class ESP32BoardSimulator:
 		"""Authenticate with the API and get JWT token"""
 		try:
 			self.status = "Logging in..."
-			response = requests.post(f"{COREAPI_URL}/login", 
+			response = self.session.post(f"{COREAPI_URL}/login", 
 								   json={
 									   'username': self.username,
 									   'password': self.password
@@ -59,6 +104,7 @@ class ESP32BoardSimulator:
 				data = response.json()
 				self.token = data['token']
 				self.headers = {'Authorization': f'Bearer {self.token}'}
+				self.session.headers.update(self.headers)
 				self.log(f"[{self.board_name}] Logged in successfully")
 				self.status = "Logged in"
 				return True
@@ -76,9 +122,9 @@ class ESP32BoardSimulator:
 		"""Register the board with the API using binary protocol"""
 		try:
 			self.status = "Registering..."
-			response = requests.post(f"{COREAPI_URL}/register",
+			response = self.session.post(f"{COREAPI_URL}/register",
 								   data=b'',  # Empty data - board ID extracted from JWT
-								   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
+								   headers=BINARY_HEADERS)
 			
 			if response.status_code == 200:
 				self.log(f"[{self.board_name}] Board registered successfully")
@@ -95,36 +141,33 @@ class ESP32BoardSimulator:
 			return False
 	
 	def poll_binary(self) -> bool:
-		"""Poll the board status using binary protocol and apply updates"""
+		"""Poll the board status using binary protocol and apply updates.
+
+		Returns False only when the server could not be reached or did not answer
+		200; a payload that fails to parse or apply is logged and still counts as
+		a successful poll, so the caller does not back off for a local error.
+		"""
 		try:
-			response = requests.get(f"{COREAPI_URL}/poll_binary",
-							  headers=self.headers)
-			if response.status_code != 200:
-				self.log(f"[{self.board_name}] Poll failed: {response.status_code}")
-				return False
+			response = self.session.get(f"{COREAPI_URL}/poll_binary")
+		except requests.RequestException as e:
+			self.log(f"[{self.board_name}] Poll error: {e}")
+			return False
+		if response.status_code != 200:
+			self.log(f"[{self.board_name}] Poll failed: {response.status_code}")
+			return False
 
+		try:
 			# Parse binary payload: prod coeffs + building consumptions
-			from .game_state import unpack_coefficients_response, GLOBAL_PRODUCTION_COEFFICIENTS
-			prod_coeffs_raw, cons_vals_raw = unpack_coefficients_response(response.content)
+			prod_coeffs_raw, cons_vals_raw = game_state.unpack_coefficients_response(response.content)
 
 			# Map production coeffs (ids -> UPPER names) into global and local
-			source_names = {
-				1: "PHOTOVOLTAIC",
-				2: "WIND",
-				3: "NUCLEAR",
-				4: "GAS",
-				5: "HYDRO",
-				6: "HYDRO_STORAGE",
-				7: "COAL",
-				8: "BATTERY",
-			}
 			# Update globals only if we actually received coefficients to avoid transient 0s
 			if prod_coeffs_raw:
-				GLOBAL_PRODUCTION_COEFFICIENTS.clear()
+				game_state.GLOBAL_PRODUCTION_COEFFICIENTS.clear()
 				for sid, coeff in prod_coeffs_raw.items():
-					name = source_names.get(sid)
+					name = SOURCE_NAMES.get(sid)
 					if name:
-						GLOBAL_PRODUCTION_COEFFICIENTS[name] = coeff
+						game_state.GLOBAL_PRODUCTION_COEFFICIENTS[name] = coeff
 
 			# After coefficients changed, auto-adjust plant productions
 			self._apply_production_coefficients()
@@ -135,10 +178,9 @@ class ESP32BoardSimulator:
 
 			# Recompute totals after updates
 			self.update_totals()
-			return True
 		except Exception as e:
-			self.log(f"[{self.board_name}] Poll error: {e}")
-			return False
+			self.log(f"[{self.board_name}] Poll apply error: {e}")
+		return True
 
 	def _apply_consumption_updates(self, cons_vals_raw: Dict[int, float]) -> None:
 		"""Update each connected consumer's consumption to current building value."""
@@ -174,8 +216,7 @@ class ESP32BoardSimulator:
 	def fetch_game_state(self) -> bool:
 		"""Fetch current game state including production coefficients"""
 		try:
-			response = requests.get(f"{COREAPI_URL}/game/status",
-								  headers=self.headers)
+			response = self.session.get(f"{COREAPI_URL}/game/status")
 			
 			if response.status_code == 200:
 				data = response.json()
@@ -195,11 +236,11 @@ class ESP32BoardSimulator:
 			prod_int = int(self.production * 1000)
 			cons_int = int(self.consumption * 1000)
 			
-			data = struct.pack('>ii', prod_int, cons_int)
+			data = POST_VALS_STRUCT.pack(prod_int, cons_int)
 			
-			response = requests.post(f"{COREAPI_URL}/post_vals",
+			response = self.session.post(f"{COREAPI_URL}/post_vals",
 								   data=data,
-								   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
+								   headers=BINARY_HEADERS)
 			
 			if response.status_code == 200:
 				return True
@@ -213,37 +254,24 @@ class ESP32BoardSimulator:
 
 	def report_connected_production(self) -> bool:
 		"""Report connected power plants"""
-		try:
-			# Report total production using simplified approach
-			# Since we're managing by source type, we just report the total
-			response = requests.post(f"{COREAPI_URL}/post_vals",
-								   data=struct.pack('>ii', int(self.production * 1000), int(self.consumption * 1000)),
-								   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
-			
-			if response.status_code == 200:
-				self.log(f"[{self.board_name}] Reported total production: {self.production:.1f}W")
-				return True
-			else:
-				self.log(f"[{self.board_name}] Production report failed: {response.status_code}")
-				return False
-				
-		except Exception as e:
-			self.log(f"[{self.board_name}] Production report error: {e}")
-			return False
+		# Production and consumption travel together in a single post_vals packet,
+		# so reporting production is just an immediate power data send
+		if self.send_power_data():
+			self.log(f"[{self.board_name}] Reported total production: {self.production:.1f}W")
+			return True
+		return False
 
 	def report_connected_consumption(self) -> bool:
 		"""Report connected consumers"""
 		try:
 			consumer_ids = list(self.connected_consumers.keys())
 			count = len(consumer_ids)
-			data = struct.pack('B', count)
-			
-			for consumer_id in consumer_ids:
-				data += struct.pack('>I', consumer_id)
+			# count(1) + [consumer_id(4)]* packed in one call
+			data = struct.pack(f'>B{count}I', count, *consumer_ids)
 			
-			response = requests.post(f"{COREAPI_URL}/cons_connected",
+			response = self.session.post(f"{COREAPI_URL}/cons_connected",
 								   data=data,
-								   headers={**self.headers, 'Content-Type': 'application/octet-stream'})
+								   headers=BINARY_HEADERS)
 			
 			if response.status_code == 200:
 				self.log(f"[{self.board_name}] Reported {count} connected consumers")
@@ -285,9 +313,6 @@ class ESP32BoardSimulator:
 			self.update_totals()
 			self.report_connected_production()
 
-			self.update_totals()
-			self.report_connected_production()
-
 	def add_consumer(self, consumer_type: str):
 		"""Add a consumer using config data"""
 		if consumer_type not in CONSUMER_POWERS:
@@ -316,9 +341,10 @@ class ESP32BoardSimulator:
 
 	def update_production_coefficients(self):
 		"""Update the board's production coefficients from the global state."""
-		from .game_state import GLOBAL_PRODUCTION_COEFFICIENTS
-		self.production_coefficients = GLOBAL_PRODUCTION_COEFFICIENTS
-		self.log(f"[{self.board_name}] Updated local coefficients: {self.production_coefficients}")
+		self.production_coefficients = game_state.GLOBAL_PRODUCTION_COEFFICIENTS
+		# Runs on every poll for every source; only format the dict when it is logged
+		if game_state.DEBUG_MODE:
+			game_state.debug_log(f"[{self.board_name}] Updated local coefficients: {self.production_coefficients}")
 
 	def get_power_plant_range(self, plant_type: str) -> tuple:
 		"""Get the min/max range for a power plant type based on count and coefficients."""
@@ -338,10 +364,12 @@ class ESP32BoardSimulator:
 		# Prefer cached server-provided max if available to avoid transient zeros
 		if plant_type in self._last_max_by_type:
 			cached_max = self._last_max_by_type[plant_type]
-			self.log(f"[{self.board_name}] Power range for {plant_type} (cached): total_max={cached_max}")
+			if game_state.DEBUG_MODE:
+				game_state.debug_log(f"[{self.board_name}] Power range for {plant_type} (cached): total_max={cached_max}")
 			return (0.0, cached_max)
 
-		self.log(f"[{self.board_name}] Power range for {plant_type}: base_max={base_max}, count={count}, coefficient={coefficient}, total_max={total_max}")
+		if game_state.DEBUG_MODE:
+			game_state.debug_log(f"[{self.board_name}] Power range for {plant_type}: base_max={base_max}, count={count}, coefficient={coefficient}, total_max={total_max}")
 
 		return (total_min, total_max)
 
@@ -353,6 +381,11 @@ class ESP32BoardSimulator:
 		"""Main simulation loop"""
 		import time
 		
+		# Retire any earlier loop for this board that is still sleeping or in a
+		# request, then give this run its own event so a restart can't revive it
+		self.stop_event.set()
+		stop_event = self.stop_event = threading.Event()
+		
 		self.log(f"[{self.board_name}] Starting board simulation")
 		
 		if not self.login():
@@ -365,38 +398,52 @@ class ESP32BoardSimulator:
 			
 		self.status = "Running"
 		self.running = True
-		last_ranges_fetch = 0.0
-		last_cons_fetch = 0.0
-		while self.running:
+		last_ranges_fetch = float("-inf")
+		last_cons_fetch = float("-inf")
+		# Random per-board phase so boards started together don't post in lockstep
+		next_tick = time.monotonic() + self.rng.uniform(0, 1.0)
+		# Seconds between ticks; doubles (up to 30 s) while the server is failing
+		period = 1.0
+		while not stop_event.is_set():
 			try:
-				now = time.time()
+				now = time.monotonic()
 				# Poll binary frequently to keep coefficients and consumptions fresh
-				self.poll_binary()
-
-				# Periodically fetch production ranges to reflect master-board behavior
-				if now - last_ranges_fetch > 5.0:
-					self._fetch_and_apply_prod_ranges()
-					last_ranges_fetch = now
-
-				# Periodically fetch explicit consumption values (backup to poll_binary)
-				if now - last_cons_fetch > 5.0:
-					self._fetch_and_apply_consumptions()
-					last_cons_fetch = now
-
-				# Always send current totals
-				self.send_power_data()
+				if self.poll_binary():
+					period = 1.0
+
+					# Periodically fetch production ranges to reflect master-board behavior
+					if now - last_ranges_fetch > 5.0:
+						self._fetch_and_apply_prod_ranges()
+						last_ranges_fetch = now
+
+					# Periodically fetch explicit consumption values (backup to poll_binary)
+					if now - last_cons_fetch > 5.0:
+						self._fetch_and_apply_consumptions()
+						last_cons_fetch = now
+
+					# Always send current totals
+					self.send_power_data()
+					delay = period
+				else:
+					# Back off with jitter so boards don't retry in lockstep after an outage
+					period = min(period * 2, 30.0)
+					delay = period * self.rng.uniform(0.5, 1.5)
 				
-				time.sleep(1)
+				# Sleep to the next deadline so request time doesn't stretch the period
+				now = time.monotonic()
+				next_tick = max(next_tick + delay, now)
+				stop_event.wait(next_tick - now)
 				
 			except Exception as e:
 				self.log(f"[{self.board_name}] Simulation error: {e}")
 				self.status = "Error"
-				time.sleep(2)
+				period = min(period * 2, 30.0)
+				stop_event.wait(period * self.rng.uniform(0.5, 1.5))
 
 	def _fetch_and_apply_prod_ranges(self) -> None:
 		"""Fetch production ranges and apply to weather-dependent plants; clamp others."""
 		try:
-			resp = requests.get(f"{COREAPI_URL}/prod_vals", headers=self.headers)
+			resp = self.session.get(f"{COREAPI_URL}/prod_vals")
 			if resp.status_code != 200:
 				return
 			data = resp.content
@@ -407,16 +454,12 @@ class ESP32BoardSimulator:
 			offset += 1
 			# Each entry: source_id(1) + min(4) + max(4)
 			for _ in range(num_entries):
-				if offset + 9 > len(data):
+				if offset + PROD_RANGE_STRUCT.size > len(data):
 					break
-				source_id, min_mw, max_mw = struct.unpack('>Bii', data[offset:offset+9])
-				offset += 9
+				source_id, min_mw, max_mw = PROD_RANGE_STRUCT.unpack_from(data, offset)
+				offset += PROD_RANGE_STRUCT.size
 				# Map id->name lower key used in sources dict
-				name_map = {
-					1: 'photovoltaic', 2: 'wind', 3: 'nuclear', 4: 'gas',
-					5: 'hydro', 6: 'hydro_storage', 7: 'coal', 8: 'battery'
-				}
-				ptype = name_map.get(source_id)
+				ptype = PLANT_TYPES.get(source_id)
 				if not ptype or ptype not in self.sources:
 					continue
 				# Prefer server-provided max (converted from mW to W) per source
@@ -439,7 +482,7 @@ class ESP32BoardSimulator:
 	def _fetch_and_apply_consumptions(self) -> None:
 		"""Fetch explicit consumption values and update consumers."""
 		try:
-			resp = requests.get(f"{COREAPI_URL}/cons_vals", headers=self.headers)
+			resp = self.session.get(f"{COREAPI_URL}/cons_vals")
 			if resp.status_code != 200:
 				return
 			data = resp.content
@@ -450,10 +493,10 @@ class ESP32BoardSimulator:
 			offset += 1
 			cons_vals = {}
 			for _ in range(count):
-				if offset + 5 > len(data):
+				if offset + CONS_VAL_STRUCT.size > len(data):
 					break
-				bid, cons_mw = struct.unpack('>Bi', data[offset:offset+5])
-				offset += 5
+				bid, cons_mw = CONS_VAL_STRUCT.unpack_from(data, offset)
+				offset += CONS_VAL_STRUCT.size
 				cons_vals[bid] = cons_mw / 1000.0
 			self._apply_consumption_updates(cons_vals)
 			self.update_totals()
@@ -462,6 +505,7 @@ class ESP32BoardSimulator:
 	
 	def stop(self):
 		"""Stop the simulation"""
+		self.stop_event.set()
 		if self.running:
 			self.log(f"[{self.board_name}] Stopping simulation")
 			self.running = False
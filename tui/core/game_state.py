@@ -20,6 +20,30 @@ GLOBAL_WEATHER = []
 GLOBAL_GAME_ACTIVE = False
 LECTURER_TOKEN = None
 LECTURER_HEADERS = {}
+# Keep-alive session for the lecturer view, polled once per second by the TUI
+LECTURER_SESSION = requests.Session()
+# Seconds before a stalled lecturer request gives up, so polling workers can't pile up
+LECTURER_TIMEOUT = 5
+# Session for the screens' poll_binary calls, which run on the UI thread: boards'
+# own sessions belong to their simulation threads and retry with backoff, so this
+# one only borrows each board's token and gives up after UI_POLL_TIMEOUT seconds
+UI_POLL_SESSION = requests.Session()
+UI_POLL_TIMEOUT = 2
+
+# Binary protocol source ids -> coefficient names
+SOURCE_NAMES = {
+	1: "PHOTOVOLTAIC",
+	2: "WIND",
+	3: "NUCLEAR",
+	4: "GAS",
+	5: "HYDRO",
+	6: "HYDRO_STORAGE",
+	7: "COAL",
+	8: "BATTERY",
+}
+
+# Precompiled unpacker for coefficient entries: id(1) + value in mW(4)
+COEFF_ENTRY_STRUCT = struct.Struct('>Bi')
 
 def get_lecturer_token():
 	"""Get lecturer authentication token"""
@@ -30,8 +54,8 @@ def get_lecturer_token():
 	
 	try:
 		# Use credentials from config
-		response = requests.post(f"{COREAPI_URL}/login", 
-							   json=LECTURER_CREDENTIALS)
+		response = LECTURER_SESSION.post(f"{COREAPI_URL}/login", 
+							   json=LECTURER_CREDENTIALS, timeout=LECTURER_TIMEOUT)
 		
 		print(f"Lecturer login response status: {response.status_code}")
 		print(f"Lecturer login response text: {response.text}")
@@ -40,6 +64,7 @@ def get_lecturer_token():
 			data = response.json()
 			LECTURER_TOKEN = data['token']
 			LECTURER_HEADERS = {'Authorization': f'Bearer {LECTURER_TOKEN}'}
+			LECTURER_SESSION.headers.update(LECTURER_HEADERS)
 			print(f"Lecturer login successful, token: {LECTURER_TOKEN[:20]}...")
 			return LECTURER_TOKEN
 		else:
@@ -59,41 +84,29 @@ def fetch_global_game_state():
 	for board in getattr(fetch_global_game_state, 'boards', []):
 		if board.token and board.headers:
 			try:
-				response = requests.get(f"{COREAPI_URL}/poll_binary", headers=board.headers)
+				response = UI_POLL_SESSION.get(f"{COREAPI_URL}/poll_binary",
+											   headers=board.headers, timeout=UI_POLL_TIMEOUT)
 				
-				debug_log(f"poll_binary API Response Status: {response.status_code}")
-				debug_log(f"poll_binary API Response Headers: {response.headers}")
-				debug_log(f"poll_binary Response Length: {len(response.content)} bytes")
+				# Guard so the header dump is only formatted when it will be written
+				if DEBUG_MODE:
+					debug_log(f"poll_binary API Response Status: {response.status_code}, "
+							  f"Headers: {response.headers}, Length: {len(response.content)} bytes")
 
 				if response.status_code == 200:
 					# Unpack binary coefficients response
 					data = response.content
 					production_coeffs, consumption_coeffs = unpack_coefficients_response(data)
 					
-					debug_log(f"Parsed production coefficients: {production_coeffs}")
-					debug_log(f"Parsed consumption coefficients: {consumption_coeffs}")
-					
 					# Convert source IDs to string names for compatibility
-					source_names = {
-						1: "PHOTOVOLTAIC",
-						2: "WIND", 
-						3: "NUCLEAR",
-						4: "GAS",
-						5: "HYDRO",
-						6: "HYDRO_STORAGE",
-						7: "COAL",
-						8: "BATTERY"
-					}
-					
 					GLOBAL_PRODUCTION_COEFFICIENTS = {}
 					for source_id, coeff in production_coeffs.items():
-						if source_id in source_names:
-							GLOBAL_PRODUCTION_COEFFICIENTS[source_names[source_id]] = coeff
+						if source_id in SOURCE_NAMES:
+							GLOBAL_PRODUCTION_COEFFICIENTS[SOURCE_NAMES[source_id]] = coeff
 
-					debug_log(f"Unpacked production coefficients: {production_coeffs}")
-					debug_log(f"Converted to GLOBAL_PRODUCTION_COEFFICIENTS: {GLOBAL_PRODUCTION_COEFFICIENTS}")
-					debug_log(f"Unpacked consumption coefficients: {consumption_coeffs}")
-					debug_log(f"Total coefficients count: {len(GLOBAL_PRODUCTION_COEFFICIENTS)}")
+					if DEBUG_MODE:
+						debug_log(f"Unpacked production coefficients: {production_coeffs}, "
+								  f"consumption coefficients: {consumption_coeffs}, "
+								  f"GLOBAL_PRODUCTION_COEFFICIENTS: {GLOBAL_PRODUCTION_COEFFICIENTS}")
 					
 					# Set other defaults since we don't have weather/game status from this endpoint
 					GLOBAL_WEATHER = []
@@ -104,12 +117,10 @@ def fetch_global_game_state():
 					debug_log(f"poll_binary failed for board {board.board_name}: {response.status_code}")
 						
 			except Exception as e:
-				with open("tui.log", "a") as log_file:
-					log_file.write(f"poll_binary error for board {board.board_name}: {e}\n")
+				debug_log(f"poll_binary error for board {board.board_name}: {e}")
 	
 	# Do not overwrite existing coefficients if no valid data received
-	with open("tui.log", "a") as log_file:
-		log_file.write(f"No valid board tokens available or poll failed; keeping previous coefficients\n")
+	debug_log("No valid board tokens available or poll failed; keeping previous coefficients")
 	return False
 
 def unpack_coefficients_response(data: bytes) -> tuple:
@@ -117,8 +128,6 @@ def unpack_coefficients_response(data: bytes) -> tuple:
 	Unpack production and consumption coefficients from binary response
 	Format: prod_count(1) + [source_id(1) + coeff(4)]* + cons_count(1) + [building_id(1) + consumption(4)]*
 	"""
-	import struct
-	
 	if len(data) < 2:
 		return {}, {}
 	
@@ -130,11 +139,11 @@ def unpack_coefficients_response(data: bytes) -> tuple:
 	
 	production_coeffs = {}
 	for i in range(prod_count):
-		if offset + 5 > len(data):
+		if offset + COEFF_ENTRY_STRUCT.size > len(data):
 			break
-		source_id, coeff_mw = struct.unpack('>Bi', data[offset:offset+5])
+		source_id, coeff_mw = COEFF_ENTRY_STRUCT.unpack_from(data, offset)
 		production_coeffs[source_id] = coeff_mw / 1000.0  # Convert from mW to W
-		offset += 5
+		offset += COEFF_ENTRY_STRUCT.size
 	
 	# Unpack consumption coefficients
 	if offset >= len(data):
@@ -145,11 +154,11 @@ def unpack_coefficients_response(data: bytes) -> tuple:
 	
 	consumption_coeffs = {}
 	for i in range(cons_count):
-		if offset + 5 > len(data):
+		if offset + COEFF_ENTRY_STRUCT.size > len(data):
 			break
-		building_id, cons_mw = struct.unpack('>Bi', data[offset:offset+5])
+		building_id, cons_mw = COEFF_ENTRY_STRUCT.unpack_from(data, offset)
 		consumption_coeffs[building_id] = cons_mw / 1000.0  # Convert from mW to W
-		offset += 5
+		offset += COEFF_ENTRY_STRUCT.size
 	
 	return production_coeffs, consumption_coeffs
 
@@ -163,10 +172,11 @@ def fetch_lecturer_view_state():
 			debug_log("Cannot fetch lecturer view state: no token.")
 			return
 
-		response = requests.get(f"{COREAPI_URL}/pollforusers", headers=LECTURER_HEADERS)
+		response = LECTURER_SESSION.get(f"{COREAPI_URL}/pollforusers", timeout=LECTURER_TIMEOUT)
 		
 		debug_log(f"/pollforusers API response status: {response.status_code}")
-		if response.status_code == 200:
+		# Only decode the full body for the debug log when it is actually written
+		if DEBUG_MODE and response.status_code == 200:
 			debug_log(f"/pollforusers API response data: {response.text}")
 
 		if response.status_code == 200:
@@ -10,7 +10,7 @@ from textual.widgets._data_table import CellDoesNotExist
 from config import BOARDS
 
 # Import core components
-from core.board_simulator import ESP32BoardSimulator
+from core.board_simulator import ESP32BoardSimulator, create_http_adapter
 from core.game_state import fetch_global_game_state, fetch_lecturer_view_state, calculate_board_status
 from config import BOARDS, STATUS_THRESHOLD_MW
 
@@ -45,6 +45,7 @@ class BoardSimTUI(App):
 		self.boards = []
 		self.threads = []
 		self.team_states = {}
+		self.lecturer_worker = None
 
 	def compose(self) -> ComposeResult:
 		"""Create child widgets for the app."""
@@ -65,12 +66,16 @@ class BoardSimTUI(App):
 		
 		log = self.query_one("#log", Log)
 		
+		# One connection pool for the whole fleet (all boards talk to the same host)
+		adapter = create_http_adapter(pool_maxsize=2 * len(BOARDS))
+		
 		self.boards = [
 			ESP32BoardSimulator(
 				board_name=board_config["name"],
 				username=board_config["username"],
 				password=board_config["password"],
-				log_callback=log.write_line
+				log_callback=log.write_line,
+				adapter=adapter
 			) for board_config in BOARDS
 		]
 		
@@ -91,13 +96,17 @@ class BoardSimTUI(App):
 
 	def update_table(self) -> None:
 		"""Update the board status table."""
-		log = self.query_one(Log)
-		
-		try:
-			# We still fetch the state to know if the game is active, etc.
-			fetch_lecturer_view_state()
-		except Exception as e:
-			log.write_line(f"Error fetching lecturer view state: {e}")
+		# We still fetch the state to know if the game is active, etc.
+		# The fetch is blocking HTTP, so run it in a worker thread instead of
+		# stalling the Textual event loop once per second. Thread workers can't
+		# be cancelled, so skip this tick while the previous fetch is still running
+		if self.lecturer_worker is None or self.lecturer_worker.is_finished:
+			self.lecturer_worker = self.run_worker(
+				fetch_lecturer_view_state,
+				thread=True,
+				group="lecturer_state",
+				exit_on_error=False
+			)
 
 		table = self.query_one(DataTable)
 		for i, board in enumerate(self.boards):
@@ -101,22 +101,23 @@ class DebugScreen(Screen):
 		except Exception as e:
 			self.log_api_call(f"ERROR fetching game state: {e}")
 		
+		# One timestamp for the whole refresh cycle
+		timestamp = datetime.now().strftime("%H:%M:%S")
+		
 		# Update coefficients table
-		self.update_coefficients_table(GLOBAL_PRODUCTION_COEFFICIENTS)
+		self.update_coefficients_table(GLOBAL_PRODUCTION_COEFFICIENTS, timestamp)
 		
 		# Update weather table  
 		self.update_weather_table(GLOBAL_WEATHER)
 		
 		# Update game status table
-		self.update_game_status_table(GLOBAL_GAME_ACTIVE, GLOBAL_PRODUCTION_COEFFICIENTS, GLOBAL_WEATHER)
+		self.update_game_status_table(GLOBAL_GAME_ACTIVE, GLOBAL_PRODUCTION_COEFFICIENTS, GLOBAL_WEATHER, timestamp)
 
-	def update_coefficients_table(self, coefficients):
+	def update_coefficients_table(self, coefficients, timestamp):
 		"""Update the production coefficients table"""
 		table = self.query_one("#coefficients_table", DataTable)
 		table.clear()
 		
-		timestamp = datetime.now().strftime("%H:%M:%S")
-		
 		if not coefficients:
 			table.add_row("No coefficients", "N/A", timestamp)
 			self.log_api_call("WARNING: No production coefficients found")
@@ -143,13 +144,11 @@ class DebugScreen(Screen):
 		
 		self.log_api_call(f"Updated weather data: {', '.join(weather_data) if weather_data else 'None'}")
 
-	def update_game_status_table(self, game_active, coefficients, weather):
+	def update_game_status_table(self, game_active, coefficients, weather, timestamp):
 		"""Update the game status table"""
 		table = self.query_one("#game_status_table", DataTable)
 		table.clear()
 		
-		timestamp = datetime.now().strftime("%H:%M:%S")
-		
 		# Game active status
 		table.add_row("Game Active", "Yes" if game_active else "No", timestamp)
 		
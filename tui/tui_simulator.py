@@ -4,9 +4,6 @@ ESP32 Board Simulator TUI
 A modular terminal user interface for ESP32 board simulation management.
 """
 
-import requests
-import struct
-import time
 import threading
 from typing import Dict, Any, Callable
 
@@ -17,156 +14,35 @@ from textual.screen import Screen
 from textual.widgets._data_table import CellDoesNotExist
 
 from config import (
-	COREAPI_URL, AVAILABLE_POWER_PLANTS, AVAILABLE_CONSUMERS, 
-	BOARDS, POWER_PLANT_POWERS, CONSUMER_POWERS, LECTURER_CREDENTIALS, STATUS_THRESHOLD_MW
+	AVAILABLE_POWER_PLANTS, AVAILABLE_CONSUMERS, 
+	BOARDS, POWER_PLANT_POWERS, CONSUMER_POWERS, STATUS_THRESHOLD_MW
 )
 
-# Import ESP32BoardSimulator with path workaround
+# Import ESP32BoardSimulator and shared game state helpers with path workaround
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'core'))
 try:
+	import game_state
 	from board_simulator import ESP32BoardSimulator
-	from game_state import fetch_lecturer_view_state, calculate_board_status
+	from game_state import fetch_global_game_state, fetch_lecturer_view_state, calculate_board_status
 except ImportError:
 	# Fallback - define a placeholder class
+	game_state = None
+
 	class ESP32BoardSimulator:
 		def __init__(self, *args, **kwargs):
 			pass
 	
-	def fetch_all_boards_state():
-		return {}
+	def fetch_global_game_state():
+		return False
+	
+	def fetch_lecturer_view_state():
+		pass
 	
 	def calculate_board_status(production, consumption):
 		return "Unknown", "gray"
 
-GLOBAL_PRODUCTION_COEFFICIENTS = {}
-GLOBAL_WEATHER = []
-GLOBAL_GAME_ACTIVE = False
-LECTURER_TOKEN = None
-LECTURER_HEADERS = {}
-TEAM_STATES = {}  # Store real team production/consumption data
-
-def get_lecturer_token():
-	"""Get lecturer authentication token"""
-	global LECTURER_TOKEN, LECTURER_HEADERS
-	
-	if LECTURER_TOKEN:
-		return LECTURER_TOKEN
-	
-	try:
-		response = requests.post(f"{COREAPI_URL}/login", 
-							   json=LECTURER_CREDENTIALS)
-		
-		print(f"Lecturer login response status: {response.status_code}")
-		print(f"Lecturer login response text: {response.text}")
-		
-		if response.status_code == 200:
-			data = response.json()
-			LECTURER_TOKEN = data['token']
-			LECTURER_HEADERS = {'Authorization': f'Bearer {LECTURER_TOKEN}'}
-			print(f"Lecturer login successful, token: {LECTURER_TOKEN[:20]}...")
-			return LECTURER_TOKEN
-		else:
-			print(f"Lecturer login failed: {response.status_code}")
-			return None
-			
-	except Exception as e:
-		print(f"Lecturer login error: {e}")
-		return None
-
-def unpack_coefficients_response(data: bytes) -> tuple:
-	"""Unpack production and consumption coefficients from binary response"""
-	if len(data) < 2:
-		return {}, {}
-	
-	offset = 0
-	
-	# Unpack production coefficients
-	prod_count = data[offset]
-	offset += 1
-	
-	production_coeffs = {}
-	for i in range(prod_count):
-		if offset + 5 > len(data):
-			break
-		source_id, coeff_mw = struct.unpack('>Bi', data[offset:offset+5])
-		production_coeffs[source_id] = coeff_mw / 1000.0  # Convert from mW to W
-		offset += 5
-	
-	# Unpack consumption coefficients
-	if offset >= len(data):
-		return production_coeffs, {}
-	
-	cons_count = data[offset]
-	offset += 1
-	
-	consumption_coeffs = {}
-	for i in range(cons_count):
-		if offset + 5 > len(data):
-			break
-		building_id, cons_mw = struct.unpack('>Bi', data[offset:offset+5])
-		consumption_coeffs[building_id] = cons_mw / 1000.0  # Convert from mW to W
-		offset += 5
-	
-	return production_coeffs, consumption_coeffs
-
-def fetch_global_game_state():
-	"""Fetch global game state from API using poll_binary endpoint"""
-	global GLOBAL_PRODUCTION_COEFFICIENTS, GLOBAL_WEATHER, GLOBAL_GAME_ACTIVE
-
-	with open("tui.log", "a") as log_file:
-		log_file.write(f"DEBUG: Fetching global game state\n")
-
-	for board in getattr(fetch_global_game_state, 'boards', []):
-		if board.token and board.headers:
-			try:
-				response = requests.get(f"{COREAPI_URL}/poll_binary", headers=board.headers)
-				
-				with open("tui.log", "a") as log_file:
-					log_file.write(f"poll_binary API Response Status: {response.status_code}\n")
-					log_file.write(f"poll_binary Response Length: {len(response.content)} bytes\n")
-
-				if response.status_code == 200:
-					data = response.content
-					production_coeffs, consumption_coeffs = unpack_coefficients_response(data)
-					
-					# Convert source IDs to string names for compatibility
-					source_names = {
-						1: "PHOTOVOLTAIC", 2: "WIND", 3: "NUCLEAR", 4: "GAS",
-						5: "HYDRO", 6: "HYDRO_STORAGE", 7: "COAL", 8: "BATTERY"
-					}
-					
-					GLOBAL_PRODUCTION_COEFFICIENTS = {}
-					for source_id, coeff in production_coeffs.items():
-						if source_id in source_names:
-							GLOBAL_PRODUCTION_COEFFICIENTS[source_names[source_id]] = coeff
-
-					with open("tui.log", "a") as log_file:
-						log_file.write(f"Unpacked coefficients: {production_coeffs}\n")
-						log_file.write(f"Global coefficients: {GLOBAL_PRODUCTION_COEFFICIENTS}\n")
-					
-					GLOBAL_WEATHER = []
-					GLOBAL_GAME_ACTIVE = len(production_coeffs) > 0
-					return True
-				else:
-					with open("tui.log", "a") as log_file:
-						log_file.write(f"poll_binary failed for {board.board_name}: {response.status_code}\n")
-						
-			except Exception as e:
-				with open("tui.log", "a") as log_file:
-					log_file.write(f"poll_binary error for {board.board_name}: {e}\n")
-	
-	# Fallback: set empty coefficients
-	GLOBAL_PRODUCTION_COEFFICIENTS = {}
-	GLOBAL_WEATHER = []
-	GLOBAL_GAME_ACTIVE = False
-	
-	with open("tui.log", "a") as log_file:
-		log_file.write(f"No valid board tokens available\n")
-	
-	return False
-
 try:
 	from .screens import (
 		ManageSourcesScreen,
@@ -328,8 +204,9 @@ class BoardSimTUI(App):
 				real_consumption = 0.0
 				grid_status = "Unknown"
 				
-				if board_id in TEAM_STATES:
-					team_state = TEAM_STATES[board_id]
+				team_states = game_state.TEAM_STATES if game_state else {}
+				if board_id in team_states:
+					team_state = team_states[board_id]
 					real_production = team_state.get('production', 0) / 1000.0
 					real_consumption = team_state.get('consumption', 0) / 1000.0
 					status_text, status_color = calculate_board_status(real_production, real_consumption)